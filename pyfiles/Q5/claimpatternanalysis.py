@@ -13,8 +13,43 @@ console summary highlighting key insights.
 
 import pandas as pd
 import numpy as np
-from datetime import datetime
-from sklearn.preprocessing import MinMaxScaler
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from pandas.api.types import union_categoricals
+
+# ID and label columns are held as categoricals so merges and groupbys
+# work on integer codes instead of hashing every value. 'status' is only
+# loaded from the policies file (ACTIVE/EXPIRED/...), so its categories are
+# never mixed with claim statuses.
+CATEGORY_COLUMNS = ['customer_id', 'policy_id', 'status']
+
+# Converts ID and label columns to categoricals shared across dataframes.
+def cast_categories(frames):
+    """Converts the categorical columns of each dataframe in place.
+    A column that appears in several frames gets the same sorted categories
+    everywhere, so merges on it stay on the categorical code path."""
+    for column in CATEGORY_COLUMNS:
+        present = [df for df in frames if column in df.columns]
+        if not present:
+            continue
+        categories = union_categoricals(
+            [df[column].astype('category') for df in present], sort_categories=True
+        ).categories
+        for df in present:
+            df[column] = pd.Categorical(df[column], categories=categories)
+
+# Divides two columns, returning 0 wherever the ratio is undefined.
+def safe_divide(numerator, denominator):
+    """Element-wise numerator / denominator as a float array.
+    Entries with a zero or missing denominator (or a missing numerator) are
+    0, matching the old replace([inf, -inf], 0).fillna(0) cleanup without
+    producing inf/NaN in the first place."""
+    num = numerator.to_numpy(dtype=float)
+    den = denominator.to_numpy(dtype=float)
+    out = np.zeros_like(num)
+    np.divide(num, den, out=out, where=(den != 0) & ~np.isnan(num) & ~np.isnan(den))
+    return out
+
 
 # data loading function
 #Loads all necessary CSV files into pandas DataFrames.
@@ -22,10 +57,39 @@ def load_data(claims_path, policies_path, customers_path, fraud_path):
     """Loads all necessary CSV files into pandas DataFrames."""
 
     try:
-        claims_df = pd.read_csv(claims_path)
-        policies_df = pd.read_csv(policies_path)
-        customers_df = pd.read_csv(customers_path)
-        fraud_df = pd.read_csv(fraud_path)
+        # Only the columns used downstream are read; dates are parsed here.
+        claims_df = pd.read_csv(
+            claims_path,
+            engine='pyarrow',
+            usecols=['claim_id', 'policy_id', 'claim_amount'],
+            dtype={'claim_id': 'int64', 'policy_id': 'int64', 'claim_amount': 'float64'},
+        )
+        policies_df = pd.read_csv(
+            policies_path,
+            engine='pyarrow',
+            usecols=['policy_id', 'customer_id', 'annual_premium', 'start_date', 'status'],
+            dtype={'policy_id': 'int64', 'customer_id': 'int64', 'annual_premium': 'float64'},
+            parse_dates=['start_date'],
+        )
+        customers_df = pd.read_csv(
+            customers_path,
+            engine='pyarrow',
+            usecols=['customer_id'],
+            dtype={'customer_id': 'int64'},
+        )
+        fraud_df = pd.read_csv(
+            fraud_path,
+            engine='pyarrow',
+            usecols=['claim_id', 'is_fraudulent'],
+            dtype={'claim_id': 'int64'},
+        )
+        cast_categories([claims_df, policies_df, customers_df, fraud_df])
+
+        # Pre-sort each table by the key it is joined on.
+        claims_df = claims_df.sort_values('claim_id', kind='stable', ignore_index=True)
+        policies_df = policies_df.sort_values('policy_id', kind='stable', ignore_index=True)
+        customers_df = customers_df.sort_values('customer_id', kind='stable', ignore_index=True)
+        fraud_df = fraud_df.sort_values('claim_id', kind='stable', ignore_index=True)
         return claims_df, policies_df, customers_df, fraud_df
     except FileNotFoundError as e:
         print(f"File not found: {e}")
@@ -38,13 +102,19 @@ def merge_dataframes(claims_df, policies_df, customers_df, fraud_df):
     The merge strategy uses left joins starting from the customers table to
     ensure all customers are retained in the final master table, even if they
     have no associated policies or claims."""
-    claims_with_fraud = pd.merge(claims_df, fraud_df, on='claim_id', how='left')
-    policies_with_claims = pd.merge(policies_df, claims_with_fraud, on='policy_id', how='left')
-    master_df = pd.merge(customers_df, policies_with_claims, on='customer_id', how='left')
+    # Keep only the columns used downstream so the joins move less data.
+    # Active premiums are taken from policies_df directly, not the master table.
+    claims_df = claims_df[['claim_id', 'policy_id', 'claim_amount']]
+    policies_df = policies_df[['policy_id', 'customer_id', 'start_date']]
+    customers_df = customers_df[['customer_id']]
+    fraud_df = fraud_df[['claim_id', 'is_fraudulent']]
 
-    for col in master_df.columns:
-        if 'date' in col.lower():
-            master_df[col] = pd.to_datetime(master_df[col], errors='coerce')
+    claims_with_fraud = pd.merge(claims_df, fraud_df, on='claim_id', how='left', validate='1:1', sort=False)
+    policies_with_claims = pd.merge(policies_df, claims_with_fraud, on='policy_id', how='left', validate='1:m', sort=False)
+    master_df = pd.merge(customers_df, policies_with_claims, on='customer_id', how='left', validate='1:m', sort=False)
+
+    date_cols = [col for col in master_df.columns if 'date' in col.lower()]
+    master_df[date_cols] = master_df[date_cols].apply(pd.to_datetime, errors='coerce')
     
     print("Dataframes merged successfully.")
     return master_df
@@ -55,33 +125,43 @@ def calculate_customer_features(master_df, policies_df):
     """ Aggregates the master dataframe to a customer-level analytical table.
     This function groups the data by customer to create key features such as
     policy tenure, total claims, and total premium from active policies."""
+    # Claims without a fraud record count as non-fraudulent.
+    master_df['is_fraudulent'] = master_df['is_fraudulent'].fillna(False).astype(bool)
+
     # Group the master table by each customer to calculate their individual metrics.
-    customer_analysis = master_df.groupby('customer_id').agg(
+    customer_analysis = master_df.groupby('customer_id', observed=True).agg(
         # Find the earliest policy start date to determine tenure.
         first_policy_start=('start_date', 'min'),
         # Count the number of unique claims for each customer.
         total_claims=('claim_id', 'nunique'),
         # Sum the total dollar amount of all claims made by the customer.
         total_claim_amount=('claim_amount', 'sum'),
-        # Count fraudulent claims; fill NaNs with False and sum True values.
-        fraud_claims=('is_fraudulent', lambda x: x.fillna(False).sum())
+        # Count fraudulent claims by summing True values.
+        fraud_claims=('is_fraudulent', 'sum')
     ).reset_index()
 
     # Calculate policy tenure in days: current date minus their first policy start date.
-    customer_analysis['policy_tenure_days'] = (datetime.now() - customer_analysis['first_policy_start']).dt.days
+    # Done on int64 nanoseconds; customers with no policies (NaT) get NaN.
+    first_start = customer_analysis['first_policy_start'].to_numpy(dtype='datetime64[ns]')
+    tenure_ns = pd.Timestamp.now().value - first_start.view('i8')
+    customer_analysis['policy_tenure_days'] = np.where(
+        np.isnat(first_start), np.nan, tenure_ns // (86_400 * 10**9)
+    )
     # Convert tenure to years, using 365.25 to account for leap years.
     customer_analysis['policy_tenure_years'] = customer_analysis['policy_tenure_days'] / 365.25
 
-    # From the policies table, filter for only 'ACTIVE' policies.
-    active_premiums = policies_df[policies_df['status'] == 'ACTIVE'].groupby('customer_id')['annual_premium'].sum().reset_index()
-    # Rename the column for clarity before merging.
-    active_premiums = active_premiums.rename(columns={'annual_premium': 'annual_premium_sum'})
-
-    # Merge the sum of active premiums into the customer analysis table.
-    # A 'left' merge ensures all customers are kept, even if they have no active policies.
-    customer_analysis = pd.merge(customer_analysis, active_premiums, on='customer_id', how='left')
-    # For customers with no active policies, fill the resulting NaN with 0.
-    customer_analysis['annual_premium_sum'] = customer_analysis['annual_premium_sum'].fillna(0)
+    # Sum premiums of 'ACTIVE' policies per customer, aligned to customer_analysis rows.
+    # Code i refers to row i (-1 if the customer is not in the table); customers
+    # with no active policies get 0. Plain values are used so the categorical
+    # dtype's unused categories cannot shift the codes.
+    customer_codes = pd.Index(customer_analysis['customer_id'].to_numpy()).get_indexer(
+        policies_df['customer_id'].to_numpy()
+    )
+    premiums = policies_df['annual_premium'].to_numpy(dtype=float)
+    mask = (policies_df['status'].to_numpy() == 'ACTIVE') & (customer_codes >= 0) & ~np.isnan(premiums)
+    customer_analysis['annual_premium_sum'] = np.bincount(
+        customer_codes[mask], weights=premiums[mask], minlength=len(customer_analysis)
+    )
     return customer_analysis
 
 
@@ -89,7 +169,7 @@ def calculate_customer_features(master_df, policies_df):
 def calculate_ltv_and_loss_ratio(df):
     """Calculates customer lifetime value (LTV) and loss ratio."""
     df['lifetime_value'] = df['annual_premium_sum'] - df['total_claim_amount']
-    df['loss_ratio'] = (df['total_claim_amount'] / df['annual_premium_sum']).replace([np.inf, -np.inf], 0).fillna(0)
+    df['loss_ratio'] = safe_divide(df['total_claim_amount'], df['annual_premium_sum'])
     return df
 
 
@@ -97,19 +177,23 @@ def calculate_ltv_and_loss_ratio(df):
 def calculate_risk_score(df):
     """Calculates a normalized, weighted risk score for each customer.
     This function first calculates claim frequency, then normalizes all risk
-    features to a 0-1 scale using MinMaxScaler. Finally, it computes a
+    features to a 0-1 scale with min-max scaling. Finally, it computes a
     composite score by applying weights to the scaled features."""
-    df['claim_frequency_per_year'] = (df['total_claims'] / df['policy_tenure_years']).replace([np.inf, -np.inf], 0).fillna(0)
+    df['claim_frequency_per_year'] = safe_divide(df['total_claims'], df['policy_tenure_years'])
     
     risk_features = ['loss_ratio', 'fraud_claims', 'claim_frequency_per_year']
-    scaler = MinMaxScaler()
-    scaled_features = scaler.fit_transform(df[risk_features])
-    
-    df['risk_score'] = (
-        scaled_features[:, 0] * 50 +  # loss_ratio
-        scaled_features[:, 1] * 30 +  # fraud_claims
-        scaled_features[:, 2] * 20    # claim_frequency_per_year
-    )
+    weights = np.array([
+        50.0,  # loss_ratio
+        30.0,  # fraud_claims
+        20.0,  # claim_frequency_per_year
+    ])
+
+    # Min-max scale each feature to 0-1; constant features scale to 0.
+    X = df[risk_features].to_numpy(dtype=float)
+    mn = np.nanmin(X, axis=0)
+    rng = np.nanmax(X, axis=0) - mn
+    rng[rng == 0] = 1
+    df['risk_score'] = ((X - mn) / rng) @ weights
     return df
 
 # Customer Segmentation
@@ -118,17 +202,18 @@ def segment_customers(df):
     """Classifies each customer into a segment based on their LTV and risk score.
     The segmentation rules are defined to create actionable business categories,
     from high-value partners to high-risk accounts needing review."""
-    def assign_segment(row):
-        if row['lifetime_value'] >= 0 and row['risk_score'] <= 40:
-            return 'Premium Partner'
-        elif row['lifetime_value'] >= 0 and 40 < row['risk_score'] <= 60:
-            return 'Growth Prospect'
-        elif row['lifetime_value'] < 0 and row['risk_score'] > 60:
-            return 'Risk Management'
-        else:
-            return 'Watch List'
-
-    df['segment'] = df.apply(assign_segment, axis=1)
+    lv = df['lifetime_value'].to_numpy()
+    rs = df['risk_score'].to_numpy()
+
+    # Conditions are evaluated in order, so the first match wins.
+    conditions = [
+        (lv >= 0) & (rs <= 40),
+        (lv >= 0) & (rs <= 60),
+        (lv < 0) & (rs > 60),
+    ]
+    choices = ['Premium Partner', 'Growth Prospect', 'Risk Management']
+
+    df['segment'] = pd.Categorical(np.select(conditions, choices, default='Watch List'))
     return df
 
 # Final Deliverables
@@ -144,12 +229,15 @@ def create_deliverables(df):
     ]].copy()
     
     output_filename = "customer_segmentation_report.csv"
-    final_df.to_csv(output_filename, index=False)
+    pacsv.write_csv(
+        pa.Table.from_pandas(final_df, preserve_index=False),
+        output_filename
+    )
     print(f"\nFinal report saved as '{output_filename}'")
 
     # E.2: Print a brief summary to the console
     segment_counts = final_df['segment'].value_counts()
-    highest_risk_customers = final_df.sort_values(by='risk_score', ascending=False).head(3)
+    highest_risk_customers = final_df.nlargest(3, 'risk_score')
 
     print("\n--- Customer Analysis Summary ---")
     